@@ -12,16 +12,19 @@ class Measure:
 
 class StaticMeasure(Measure):
     _value: float
+    _millimeters: float
 
     def __init__(self, value: float):
         self._value = value
+        # measures never change, so the conversion only has to happen once
+        self._millimeters = value * self.ratio()
     
     @staticmethod
     def ratio() -> float:
         raise NotImplementedError()
 
     def value(self) -> float:
-        return self._value * self.ratio()
+        return self._millimeters
 
 
 class CompoundMeasure(Measure):
@@ -3,9 +3,22 @@ from typing import Optional
 from efficio.objects.shapes import Shape
 
 class EfficioObject:
+    _cached_shape: Optional[Shape] = None
 
     def cut(self) -> Optional[Shape]:
         return None
 
     def shape(self) -> Optional[Shape]:
-        raise NotImplementedError('EfficioObject::shape()')
+        # objects are immutable once constructed (their parameters are read only
+        # and sub-objects must not be replaced), so the geometry only needs to be
+        # built once. callers get a clone with its own workplane since Shape
+        # methods mutate.
+        if self._cached_shape is None:
+            self._cached_shape = self._build_shape()
+            if self._cached_shape is None:
+                return None
+
+        return self._cached_shape.clone()
+
+    def _build_shape(self) -> Optional[Shape]:
+        raise NotImplementedError('EfficioObject::_build_shape()')
@@ -17,16 +17,28 @@ PART_SPACING = Millimeter(1)
 
 
 class RoundedBox(EfficioObject):
-    length: Measure
-    width: Measure
-    depth: Measure
+    _length: Measure
+    _width: Measure
+    _depth: Measure
 
     def __init__(self, width: Measure, length: Measure, depth: Measure):
-        self.width = width
-        self.length = length
-        self.depth = depth
+        self._width = width
+        self._length = length
+        self._depth = depth
 
-    def shape(self) -> Optional[Shape]:
+    @property
+    def width(self) -> Measure:
+        return self._width
+
+    @property
+    def length(self) -> Measure:
+        return self._length
+
+    @property
+    def depth(self) -> Measure:
+        return self._depth
+
+    def _build_shape(self) -> Optional[Shape]:
         box_width_mm = self.width.value()
         box_length_mm = self.length.value()
         box_depth_mm = self.depth.value()
@@ -28,7 +28,7 @@ class M3BoltShaft(EfficioObject):
         self._length = length
         self._has_clearance = has_clearance
 
-    def shape(self) -> Optional[Shape]:
+    def _build_shape(self) -> Optional[Shape]:
         shaft_length_mm = self._length.value()
         shaft_radius_mm = M3_SHAFT_RADIUS_MILLIMETERS.value()
         shaft_clearance_mm = 0.0
@@ -49,7 +49,7 @@ class M3BoltHead(EfficioObject):
     def __init__(self, has_clearance: bool):
         self._has_clearance = has_clearance
 
-    def shape(self) -> Optional[Shape]:
+    def _build_shape(self) -> Optional[Shape]:
         head_length_mm = M3_HEAD_HEIGHT_MILLIMETERS.value()
         head_radius_mm = M3_HEAD_RADIUS_MILLIMETERS.value()
         head_clearance_mm = 0.0
@@ -60,19 +60,27 @@ class M3BoltHead(EfficioObject):
         return head_shape
 
 class M3Bolt(EfficioObject):
-    head: M3BoltHead
-    shaft: M3BoltShaft
+    _head: M3BoltHead
+    _shaft: M3BoltShaft
     
     def __init__(self, length: Measure, has_clearance: bool):
-        self.head = M3BoltHead(has_clearance)
-        self.shaft = M3BoltShaft(length, has_clearance)
+        self._head = M3BoltHead(has_clearance)
+        self._shaft = M3BoltShaft(length, has_clearance)
 
-    def shape(self) -> Optional[Shape]:
-        head_shape = self.head.shape()
+    @property
+    def head(self) -> M3BoltHead:
+        return self._head
+
+    @property
+    def shaft(self) -> M3BoltShaft:
+        return self._shaft
+
+    def _build_shape(self) -> Optional[Shape]:
+        head_shape = self._head.shape()
         if head_shape is None:
             return None
 
-        shaft_shape = self.shaft.shape()
+        shaft_shape = self._shaft.shape()
         if shaft_shape is None:
             return None
         shaft_shape = shaft_shape.translate(0, 0, M3_HEAD_HEIGHT_MILLIMETERS.value())
@@ -86,7 +94,7 @@ class M3HexNut(EfficioObject):
     def __init__(self, has_clearance: bool):
         self._has_clearance = has_clearance
     
-    def shape(self) -> Optional[Shape]:
+    def _build_shape(self) -> Optional[Shape]:
         nut_wac_mm = M3_NUT_WAC_MILLIMETERS.value()
         nut_height_mm = M3_NUT_HEIGHT_MILLIMETERS.value()
         nut_clearance_mm = 0.0
@@ -97,37 +105,45 @@ class M3HexNut(EfficioObject):
         return nut_shape
 
 class M3BoltAssembly(EfficioObject):
-    bolt: M3Bolt
-    nut: M3HexNut
+    _bolt: M3Bolt
+    _nut: M3HexNut
 
     def __init__(self, length: Measure, has_clearance: bool):
-        self.bolt = M3Bolt(length, has_clearance)
-        self.nut = M3HexNut(has_clearance)
+        self._bolt = M3Bolt(length, has_clearance)
+        self._nut = M3HexNut(has_clearance)
+
+    @property
+    def bolt(self) -> M3Bolt:
+        return self._bolt
+
+    @property
+    def nut(self) -> M3HexNut:
+        return self._nut
     
-    def shape(self) -> Optional[Shape]:
-        bolt_shape = self.bolt.shape()
+    def _build_shape(self) -> Optional[Shape]:
+        bolt_shape = self._bolt.shape()
         if bolt_shape is None:
             return None
 
-        nut_shape = self.nut.shape()
+        nut_shape = self._nut.shape()
         if nut_shape is None:
             return None
 
         head_height_mm = M3_HEAD_HEIGHT_MILLIMETERS.value()
-        shaft_height_mm = self.bolt.shaft.length().value()
+        shaft_height_mm = self._bolt.shaft.length().value()
         nut_height_mm = M3_NUT_HEIGHT_MILLIMETERS.value()
 
         nut_shape = nut_shape.translate(0, 0, head_height_mm + shaft_height_mm - nut_height_mm)
         return bolt_shape.union(nut_shape)
 
 class M3BoltChannel(EfficioObject):
-    bolt_assembly: M3BoltAssembly
-    column: Cylinder
+    _bolt_assembly: M3BoltAssembly
+    _column: Cylinder
 
     def __init__(self, length: Measure):
-        self.bolt_assembly = M3BoltAssembly(length, True)
+        self._bolt_assembly = M3BoltAssembly(length, True)
 
-        assembly_shape = self.bolt_assembly.shape()
+        assembly_shape = self._bolt_assembly.shape()
         if assembly_shape is None:
             return
         
@@ -142,21 +158,29 @@ class M3BoltChannel(EfficioObject):
         if assembly_length > max_diameter:
             max_diameter = assembly_length
         
-        self.column = Cylinder(
+        self._column = Cylinder(
             Millimeter(assembly_height),
             Millimeter(max_diameter/2 + M3_CHANNEL_PADDING_MILLIMETERS.value())
         )
 
-    def shape(self) -> Optional[Shape]:
-        channel = self.column.shape()
+    @property
+    def bolt_assembly(self) -> M3BoltAssembly:
+        return self._bolt_assembly
+
+    @property
+    def column(self) -> Cylinder:
+        return self._column
+
+    def _build_shape(self) -> Optional[Shape]:
+        channel = self._column.shape()
         if channel is None:
             return None
 
-        assembly = self.bolt_assembly.shape()
+        assembly = self._bolt_assembly.shape()
         if assembly is None:
             return None
 
         return channel.cut(assembly)
 
     def cut(self) -> Optional[Shape]:
-        return self.column.shape()
+        return self._column.shape()
@@ -8,14 +8,22 @@ from efficio.objects.base import EfficioObject
 from efficio.objects.shapes import new_shape, Orientation, Shape
 
 class Cylinder(EfficioObject):
-    length: Measure
-    radius: Measure
+    _length: Measure
+    _radius: Measure
 
     def __init__(self, length: Measure, radius: Measure):
-        self.length = length
-        self.radius = radius
+        self._length = length
+        self._radius = radius
 
-    def shape(self) -> Optional[Shape]:
+    @property
+    def length(self) -> Measure:
+        return self._length
+
+    @property
+    def radius(self) -> Measure:
+        return self._radius
+
+    def _build_shape(self) -> Optional[Shape]:
         length_mm = self.length.value()
         radius_mm = self.radius.value()
 
@@ -24,16 +32,28 @@ class Cylinder(EfficioObject):
         return shaft_shape
 
 class Box(EfficioObject):
-    width: Measure
-    length: Measure
-    depth: Measure
+    _width: Measure
+    _length: Measure
+    _depth: Measure
 
     def __init__(self, width: Measure, length: Measure, depth: Measure):
-        self.width = width
-        self.length = length
-        self.depth = depth
+        self._width = width
+        self._length = length
+        self._depth = depth
+
+    @property
+    def width(self) -> Measure:
+        return self._width
+
+    @property
+    def length(self) -> Measure:
+        return self._length
+
+    @property
+    def depth(self) -> Measure:
+        return self._depth
 
-    def shape(self) -> Optional[Shape]:
+    def _build_shape(self) -> Optional[Shape]:
         width_mm = self.width.value()
         length_mm = self.length.value()
         depth_mm = self.depth.value()
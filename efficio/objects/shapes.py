@@ -1,18 +1,76 @@
-from typing import Optional, Tuple, BinaryIO
+from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
+import copy
+import itertools
+import math
+import os
+import tempfile
 
 import cadquery
+from OCP.gp import gp_Quaternion, gp_Trsf, gp_Vec  # type: ignore
+from OCP.StlAPI import StlAPI_Writer  # type: ignore
+
+__all__ = [
+    'Orientation',
+    'Shape',
+    'WorkplaneShape',
+    'new_shape',
+]
+
+_AXIS_X = (1.0, 0.0, 0.0)
+_AXIS_Y = (0.0, 1.0, 0.0)
+_AXIS_Z = (0.0, 0.0, 1.0)
+_AXIS_NEGATIVE_Z = (0.0, 0.0, -1.0)
 
 class Orientation(Enum):
     Front = 'XY'
     Left = 'YZ'
     Top = 'XZ'
 
+# parsing a named plane is repeated work, so each orientation's plane is built
+# once and new workplanes start from a copy of it
+_PLANES: Dict[Orientation, cadquery.Plane] = {
+    orientation: cadquery.Plane.named(orientation.value) for orientation in Orientation
+}
+
+def _rotation(x: float, y: float, z: float) -> gp_Trsf:
+    # rotations about x, then y, then z (in degrees) composed into one transform;
+    # quaternion products apply right to left
+    rotation = gp_Quaternion(gp_Vec(*_AXIS_Z), math.radians(z))
+    rotation = rotation.Multiplied(gp_Quaternion(gp_Vec(*_AXIS_Y), math.radians(y)))
+    rotation = rotation.Multiplied(gp_Quaternion(gp_Vec(*_AXIS_X), math.radians(x)))
+
+    transform = gp_Trsf()
+    transform.SetRotation(rotation)
+    return transform
+
+def _translation(x: float, y: float, z: float) -> gp_Trsf:
+    transform = gp_Trsf()
+    transform.SetTranslation(gp_Vec(x, y, z))
+    return transform
+
+def _copy_workplane(workplane: cadquery.Workplane) -> cadquery.Workplane:
+    # the B-rep shapes themselves are never modified, but add() and the pending
+    # wires and edges change a workplane's object list and context in place,
+    # so a copy gets its own of each
+    copied = copy.copy(workplane)
+    copied.objects = list(workplane.objects)
+    copied.ctx = copy.copy(workplane.ctx)
+    copied.ctx.pendingWires = list(workplane.ctx.pendingWires)
+    copied.ctx.pendingEdges = list(workplane.ctx.pendingEdges)
+    copied.ctx.tags = dict(workplane.ctx.tags)
+    return copied
+
+
 class Shape:
+    __slots__ = ()
 
     def workplane(self) -> cadquery.Workplane:
         raise NotImplementedError('Shape::workplane()')
 
+    def clone(self) -> 'Shape':
+        raise NotImplementedError('Shape::clone()')
+
     def bounds(self) -> Optional[Tuple[float, float, float, float, float, float]]:
         raise NotImplementedError('Shape::bounds()')
 
@@ -49,118 +107,302 @@ class Shape:
     def cut_from_bottom(self, distance_from_bottom: float, clone: bool = False) -> 'Shape':
         raise NotImplementedError('Shape::cut_from_bottom()')
 
-    def as_stl_file(self, filename: str) -> None:
+    def as_stl_bytes(self, binary: bool = True) -> bytes:
+        raise NotImplementedError('Shape::as_stl_bytes()')
+
+    def as_stl_file(self, filename: str, binary: bool = True) -> None:
         raise NotImplementedError('Shape::as_stl_file()')
 
     def as_svg_file(self, filename: str, projection: Tuple[float, float, float] = (1.0, 1.0, 1.0)) -> None:
         raise NotImplementedError('Shape::as_svg_file()')
 
 class WorkplaneShape(Shape):
+    __slots__ = (
+        '_orientation',
+        '_workplane',
+        '_bounds_cache',
+        '_tess_cache',
+        '_ops',
+        'stl_tolerance',
+        'stl_angular_tolerance',
+    )
+
     _orientation: Orientation
-    _workplane: cadquery.Workplane
+    _workplane: Optional[cadquery.Workplane]
+    _bounds_cache: Optional[Tuple[float, float, float, float, float, float]]
+    _tess_cache: Optional[Tuple[float, float, bool, bytes]]
+    _ops: List[Tuple[str, Tuple[Any, ...]]]
+
+    stl_tolerance: float
+    stl_angular_tolerance: float
 
     def __init__(self, orientation: Orientation):
         self._orientation = orientation
-        self._workplane = cadquery.Workplane(self._orientation.value)
+        self._workplane = None
+        self._bounds_cache = None
+        self._tess_cache = None
+        self._ops = []
+        # cadquery's defaults. BRepMesh runs in relative mode, so the linear
+        # deflection is a fraction of each edge's size and already scales with the part
+        self.stl_tolerance = 0.1
+        self.stl_angular_tolerance = 0.1
+
+    @property
+    def _wp(self) -> cadquery.Workplane:
+        # anything that reads the geometry needs the recorded operations applied first
+        self._flush()
+        return self._base()
+
+    def _base(self) -> cadquery.Workplane:
+        # many shapes are temporaries that never get built on, so the
+        # workplane is only created once something actually needs it
+        if self._workplane is None:
+            self._workplane = cadquery.Workplane(copy.copy(_PLANES[self._orientation]))
+        return self._workplane
+
+    def _record(self, name: str, *args: Any) -> 'Shape':
+        # builders chain many operations before anything looks at the result,
+        # so they are only recorded here and run together by _flush
+        self._ops.append((name, args))
+        self._invalidate()
+        return self
+
+    def _flush(self) -> None:
+        if not self._ops:
+            return
+
+        # the replay works on a local workplane and only replaces the shape's
+        # state once every op succeeded, so a failing op raises on each read
+        # instead of the recorded ops being dropped
+        workplane = self._base()
+        for name, run in itertools.groupby(self._ops, key=lambda op: op[0]):
+            if name in ('union', 'cut'):
+                workplane = self._boolean(workplane, name, [args[0] for _, args in run])
+            elif name == 'move':
+                # a run of translations and rotations composes into one transform,
+                # so every shape is relocated once however many moves were made
+                transform = gp_Trsf()
+                for _, args in run:
+                    transform.PreMultiply(args[0])
+                workplane = self._apply(workplane, name, (transform,))
+            else:
+                for _, args in run:
+                    workplane = self._apply(workplane, name, args)
+        self._workplane = workplane
+        self._ops = []
+
+    def _boolean(self, workplane: cadquery.Workplane, name: str, operands: List[cadquery.Workplane]) -> cadquery.Workplane:
+        # chained unions or cuts are applied as one n-ary boolean, which OCCT
+        # handles much faster than the equivalent sequence of pairwise ones
+        if len(operands) == 1:
+            combined = operands[0]
+        elif name == 'union':
+            combined = cadquery.Workplane(copy.copy(_PLANES[self._orientation])).add(
+                [solid for operand in operands for solid in operand.solids().vals()]
+            )
+        else:
+            combined = cadquery.Workplane(copy.copy(_PLANES[self._orientation])).add(
+                [tool for operand in operands for tool in operand.vals()]
+            )
+
+        if name == 'union':
+            return workplane.union(combined)
+        return workplane.cut(combined)
+
+    @staticmethod
+    def _apply(workplane: cadquery.Workplane, name: str, args: Tuple[Any, ...]) -> cadquery.Workplane:
+        if name == 'move':
+            # moving by a single location leaves the geometry itself untouched, where
+            # Workplane.translate and Workplane.rotate copy the whole B-rep every time
+            location = cadquery.Location(args[0])
+            return workplane.newObject([
+                item.moved(location) if isinstance(item, cadquery.Shape) else item
+                for item in workplane.objects
+            ])
+        if name == 'box':
+            return workplane.box(*args)
+        if name == 'circle':
+            return workplane.circle(*args)
+        if name == 'extrude':
+            return workplane.extrude(*args)
+        if name == 'polygon':
+            return workplane.polygon(*args)
+        if name == 'fillet_edges':
+            return workplane.edges().fillet(*args)
+        raise ValueError(f"Unknown operation: '{name}'")
+
+    def _update(self, workplane: cadquery.Workplane) -> None:
+        # every change to the geometry goes through here so cached values stay valid
+        self._workplane = workplane
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._bounds_cache = None
+        self._tess_cache = None
 
     def workplane(self) -> cadquery.Workplane:
-        return self._workplane
+        return self._wp
+
+    def clone(self) -> 'Shape':
+        self._flush()
+        cloned = WorkplaneShape(self._orientation)
+        if self._workplane is not None:
+            cloned._workplane = _copy_workplane(self._workplane)
+        cloned._bounds_cache = self._bounds_cache
+        cloned._tess_cache = self._tess_cache
+        cloned.stl_tolerance = self.stl_tolerance
+        cloned.stl_angular_tolerance = self.stl_angular_tolerance
+        return cloned
 
     def box(self, width: float, length: float, depth: float) -> 'Shape':
-        self._workplane = self._workplane.box(width, length, depth)
-        return self
+        return self._record('box', width, length, depth)
 
     def circle(self, radius: float) -> Shape:
-        self._workplane = self._workplane.circle(radius)
-        return self
+        return self._record('circle', radius)
     
     def extrude(self, distance: float) -> Shape:
-        self._workplane = self._workplane.extrude(distance)
-        return self
+        return self._record('extrude', distance)
 
     def union(self, other: Shape) -> Shape:
-        if not isinstance(other, self.__class__):
+        if not isinstance(other, WorkplaneShape):
             raise TypeError(f"Unsupported Shape: {type(other).__name__}")
         
-        self._workplane = self._workplane.union(other.workplane())
-        return self
+        # only a run of like operations is batched, since unions and cuts don't commute
+        return self._record('union', other.workplane())
 
     def cut(self, other: Shape) -> Shape:
-        if not isinstance(other, self.__class__):
+        if not isinstance(other, WorkplaneShape):
             raise TypeError(f"Unsupported Shape: {type(other).__name__}")
         
-        self._workplane = self._workplane.cut(other.workplane())
-        return self
+        return self._record('cut', other.workplane())
 
     def translate(self, x: float, y: float, z: float) -> Shape:
-        self._workplane = self._workplane.translate((x, y, z))
-        return self
+        if not x and not y and not z:
+            return self
+
+        return self._record('move', _translation(x, y, z))
 
     def rotate(self, x: float, y: float, z: float) -> 'Shape':
-        if x:
-            self._workplane = self._workplane.rotate((0, 0, 0), (1, 0, 0), x)
-        if y:
-            self._workplane = self._workplane.rotate((0, 0, 0), (0, 1, 0), y)
-        if z:
-            self._workplane = self._workplane.rotate((0, 0, 0), (0, 0, 1), z)
+        if not x and not y and not z:
+            return self
 
-        return self
+        return self._record('move', _rotation(x, y, z))
 
     def polygon(self, sides: int, side_length: float) -> Shape:
-        self._workplane = self._workplane.polygon(sides,  side_length)
-        return self
+        return self._record('polygon', sides, side_length)
 
     def fillet_edges(self, radius: float) -> 'Shape':
-        self._workplane = self._workplane.edges().fillet(radius)
-        return self
+        return self._record('fillet_edges', radius)
+
+    def _split(self, distance: float, from_top: bool) -> cadquery.Workplane:
+        # keeps the part of the solid within distance of its top or bottom face
+        bounds = self.bounds()
+        if bounds is None:
+            selector = '>Z' if from_top else '<Z'
+            return self._wp.faces(selector).workplane(-distance).split(keepTop=True)
+
+        # the split plane comes straight from the cached bounds rather than
+        # a face selection, which has to scan every face of the solid
+        center_x = (bounds[0] + bounds[3]) / 2
+        center_y = (bounds[1] + bounds[4]) / 2
+        if from_top:
+            plane = cadquery.Plane((center_x, center_y, bounds[5] - distance), _AXIS_X, _AXIS_Z)
+        else:
+            plane = cadquery.Plane((center_x, center_y, bounds[2] + distance), _AXIS_X, _AXIS_NEGATIVE_Z)
+
+        return self._wp.copyWorkplane(cadquery.Workplane(plane)).split(keepTop=True)
 
     def cut_from_top(self, distance_from_top: float, clone: bool = False) -> 'Shape':
-        result = self._workplane.faces(">Z").workplane(-distance_from_top).split(keepTop=True)
+        result = self._split(distance_from_top, from_top=True)
         if not clone:
-            self._workplane = result
+            self._update(result)
             return self
 
         cloned = WorkplaneShape(self._orientation)
-        cloned._workplane = result
+        cloned._workplane = _copy_workplane(result)
         return cloned
 
     def cut_from_bottom(self, distance_from_bottom: float, clone: bool = False) -> 'Shape':
-        result = self._workplane.faces("<Z").workplane(-distance_from_bottom).split(keepTop=True)
+        result = self._split(distance_from_bottom, from_top=False)
         if not clone:
-            self._workplane = result
+            self._update(result)
             return self
 
         cloned = WorkplaneShape(self._orientation)
-        cloned._workplane = result
+        cloned._workplane = _copy_workplane(result)
         return cloned
 
 
     def bounds(self) -> Optional[Tuple[float, float, float, float, float, float]]:
-        shapes = self._workplane.vals()
+        if self._bounds_cache is not None:
+            return self._bounds_cache
+
+        shapes = self._wp.vals()
         if shapes is None or len(shapes) == 0:
             return None
 
-        min_x = min_y = min_z = float('inf')
-        max_x = max_y = max_z = float('-inf')
-
-        for shape in shapes:
-            if not hasattr(shape, 'BoundingBox'):
-                continue
-            bounding_box = shape.BoundingBox()
-            min_x = min(min_x, bounding_box.xmin)
-            min_y = min(min_y, bounding_box.ymin)
-            min_z = min(min_z, bounding_box.zmin)
-            max_x = max(max_x, bounding_box.xmax)
-            max_y = max(max_y, bounding_box.ymax)
-            max_z = max(max_z, bounding_box.zmax)
-
-        return min_x, min_y, min_z, max_x, max_y, max_z
+        cq_shapes = [shape for shape in shapes if isinstance(shape, cadquery.Shape)]
+        if len(cq_shapes) == 0:
+            return None
 
-    def as_stl_file(self, filename: str) -> None:
-        cadquery.exporters.export(self._workplane, fname=filename, exportType='STL')
+        # a single Bnd_Box pass over the compound replaces one per shape plus
+        # the reduction over them
+        if len(cq_shapes) == 1:
+            bounding_box = cq_shapes[0].BoundingBox()
+        else:
+            bounding_box = cadquery.Compound.makeCompound(cq_shapes).BoundingBox()
+
+        self._bounds_cache = (
+            bounding_box.xmin, bounding_box.ymin, bounding_box.zmin,
+            bounding_box.xmax, bounding_box.ymax, bounding_box.zmax
+        )
+        return self._bounds_cache
+
+    def as_stl_bytes(self, binary: bool = True) -> bytes:
+        cached = self._cached_stl(binary)
+        if cached is not None:
+            return cached
+
+        # StlAPI_Writer can only write to a path, so the bytes go through a scratch file
+        with tempfile.TemporaryDirectory() as directory:
+            return self._export_stl(os.path.join(directory, 'shape.stl'), binary)
+
+    def as_stl_file(self, filename: str, binary: bool = True) -> None:
+        cached = self._cached_stl(binary)
+        if cached is not None:
+            with open(filename, 'wb') as stl_file:
+                stl_file.write(cached)
+            return
+
+        self._export_stl(filename, binary)
+
+    def _cached_stl(self, binary: bool) -> Optional[bytes]:
+        # tessellation dominates export time, so reuse the last export of this geometry
+        key = (self.stl_tolerance, self.stl_angular_tolerance, binary)
+        if self._tess_cache is not None and self._tess_cache[:3] == key:
+            return self._tess_cache[3]
+        return None
+
+    def _export_stl(self, filename: str, binary: bool) -> bytes:
+        compound = cadquery.Compound.makeCompound(
+            [shape for shape in self._wp.vals() if isinstance(shape, cadquery.Shape)]
+        )
+
+        # meshing and writing both stay in OCCT. mesh() leaves faces alone when they
+        # already carry a fine enough triangulation, so exporting the same geometry
+        # in both encodings only meshes it once.
+        compound.mesh(self.stl_tolerance, self.stl_angular_tolerance)
+        writer = StlAPI_Writer()
+        writer.ASCIIMode = not binary
+        writer.Write(compound.wrapped, filename)
+
+        with open(filename, 'rb') as stl_file:
+            data = stl_file.read()
+        self._tess_cache = (self.stl_tolerance, self.stl_angular_tolerance, binary, data)
+        return data
 
     def as_svg_file(self, filename: str, projection: Tuple[float, float, float] = (1.0, 1.0, 1.0)) -> None:
-        cadquery.exporters.export(self._workplane, fname=filename, exportType='SVG', opt={"projectionDir": projection})
+        cadquery.exporters.export(self._wp, fname=filename, exportType='SVG', opt={"projectionDir": projection})
 
 
 def new_shape(orientation: Orientation = Orientation.Front) -> Shape:
@@ -1,25 +1,50 @@
+import hashlib
 import io
 
-from typing import Tuple
+from collections import OrderedDict
+from concurrent.futures import Executor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
 
 import cadquery as cq
-from PIL import Image
+import numpy
+import numpy.typing
+from PIL import Image, ImageDraw
+
+from OCP.BRepAdaptor import BRepAdaptor_Curve  # type: ignore
+from OCP.BRepLib import BRepLib  # type: ignore
+from OCP.GCPnts import GCPnts_QuasiUniformDeflection  # type: ignore
+from OCP.HLRAlgo import HLRAlgo_Projector  # type: ignore
+from OCP.HLRBRep import HLRBRep_Algo, HLRBRep_HLRToShape  # type: ignore
+from OCP.gp import gp_Ax2, gp_Dir, gp_Pnt  # type: ignore
 
 from svglib.svglib import svg2rlg  # type: ignore
 from reportlab.graphics import renderPM  # type: ignore
 
+VIEW_SIZE = 800
+VIEW_MARGIN = 50
+STROKE_WIDTH = 2
+STROKE_COLOR = (0, 0, 0)
+HIDDEN_COLOR = (0, 0, 255)
+HIDDEN_DASH = 8
+
+_Polyline = numpy.typing.NDArray[numpy.float64]
+
+# same tolerances the cadquery SVG exporter uses for its projection
+_HLR_TOLERANCE = 1e-6
+_DISCRETIZATION_TOLERANCE = 1e-3
+
 def create_view_svg(shape: cq.Workplane, projection_dir: Tuple[float, float, float]) -> bytes:
     svg = cq.exporters.svg.getSVG(
         shape.val(),
         opts={
-            "width": 800,
-            "height": 800,
-            "marginLeft": 50,
-            "marginTop": 50,
+            "width": VIEW_SIZE,
+            "height": VIEW_SIZE,
+            "marginLeft": VIEW_MARGIN,
+            "marginTop": VIEW_MARGIN,
             "projectionDir": projection_dir,
-            "strokeWidth": 2,
-            "strokeColor": (0, 0, 0),
-            "hiddenColor": (0, 0, 255),
+            "strokeWidth": STROKE_WIDTH,
+            "strokeColor": STROKE_COLOR,
+            "hiddenColor": HIDDEN_COLOR,
             "showAxis": True,
         }
     ) # type: ignore
@@ -43,31 +68,208 @@ def convert_svg_to_png(svg_bytes: bytes) -> Image.Image:
 
     return img
 
-def create_composite_image(obj: cq.Workplane) -> Image.Image:
-    # Generate SVGs for different views
-    svg_top = create_view_svg(obj, (0, 0, 1))
-    svg_front = create_view_svg(obj, (0, 1, 0))
-    svg_left = create_view_svg(obj, (1, 0, 0))
-    svg_iso = create_view_svg(obj, (1, 1, 1))
-
-    # Convert SVGs to PNGs
-    img_top = convert_svg_to_png(svg_top)
-    img_front = convert_svg_to_png(svg_front)
-    img_left = convert_svg_to_png(svg_left)
-    img_iso = convert_svg_to_png(svg_iso)
-
-    # Determine the size of the composite image
-    width, height = img_top.size
-    composite_width = width * 2
-    composite_height = height * 2
-
-    # Create a new blank image
-    composite_image = Image.new('RGB', (composite_width, composite_height), 'white')
-
-    # Paste each view into the composite image
-    composite_image.paste(img_top, (0, 0))
-    composite_image.paste(img_front, (width, 0))
-    composite_image.paste(img_left, (0, height))
-    composite_image.paste(img_iso, (width, height))
-
-    return composite_image
+def _discretize_edges(compounds: List[Any]) -> List[_Polyline]:
+    polylines = []
+    for compound in compounds:
+        if compound.IsNull():
+            continue
+
+        # the projected edges only carry 2d curves until these are rebuilt
+        BRepLib.BuildCurves3d_s(compound, _HLR_TOLERANCE)
+        for edge in cq.Shape.cast(compound).Edges():
+            curve = BRepAdaptor_Curve(edge.wrapped)
+            points = GCPnts_QuasiUniformDeflection(
+                curve,
+                _DISCRETIZATION_TOLERANCE,
+                curve.FirstParameter(),
+                curve.LastParameter()
+            )
+            if not points.IsDone() or points.NbPoints() < 2:
+                continue
+
+            polylines.append(numpy.array([
+                (points.Value(i).X(), points.Value(i).Y()) for i in range(1, points.NbPoints() + 1)
+            ]))
+
+    return polylines
+
+def _project_edges(
+    shape: cq.Shape,
+    projection_dir: Tuple[float, float, float]
+) -> Tuple[List[_Polyline], List[_Polyline]]:
+    hlr = HLRBRep_Algo()
+    hlr.Add(shape.wrapped)
+    hlr.Projector(HLRAlgo_Projector(gp_Ax2(gp_Pnt(), gp_Dir(*projection_dir))))
+    hlr.Update()
+    hlr.Hide()
+
+    hlr_shapes = HLRBRep_HLRToShape(hlr)
+    visible = _discretize_edges([
+        hlr_shapes.VCompound(),
+        hlr_shapes.Rg1LineVCompound(),
+        hlr_shapes.OutLineVCompound(),
+    ])
+    hidden = _discretize_edges([
+        hlr_shapes.HCompound(),
+        hlr_shapes.OutLineHCompound(),
+    ])
+    return visible, hidden
+
+def _dashes(polyline: _Polyline, length: float) -> List[_Polyline]:
+    # splits a polyline into dashes of the given length with equal gaps between them
+    steps = numpy.hypot(*numpy.diff(polyline, axis=0).T)
+    distance = numpy.concatenate(([0.0], numpy.cumsum(steps)))
+
+    dashes = []
+    for start in numpy.arange(0.0, distance[-1], 2 * length):
+        end = min(start + length, distance[-1])
+        inner = distance[(distance > start) & (distance < end)]
+        along = numpy.concatenate(([start], inner, [end]))
+        dashes.append(numpy.column_stack((
+            numpy.interp(along, distance, polyline[:, 0]),
+            numpy.interp(along, distance, polyline[:, 1]),
+        )))
+
+    return dashes
+
+def render_view_png(
+    shape: cq.Workplane,
+    projection_dir: Tuple[float, float, float],
+    width: int = VIEW_SIZE,
+    height: int = VIEW_SIZE
+) -> Image.Image:
+    # Rasterizes the hidden line projection directly instead of writing it out as
+    # SVG only to parse it straight back in again.
+    solid = shape.val()
+    if not isinstance(solid, cq.Shape):
+        raise TypeError(f"Expected a cadquery Shape but got: {type(solid).__name__}")
+
+    visible, hidden = _project_edges(solid, projection_dir)
+
+    image = Image.new('RGB', (width, height), 'white')
+    if not visible and not hidden:
+        return image
+
+    # fit the drawing the same way the SVG exporter does
+    points = numpy.concatenate(visible + hidden)
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+    unit_scale = min(
+        width / max(max_x - min_x, _HLR_TOLERANCE) * 0.75,
+        height / max(max_y - min_y, _HLR_TOLERANCE) * 0.75
+    )
+
+    draw = ImageDraw.Draw(image)
+
+    for color, polylines in ((HIDDEN_COLOR, hidden), (STROKE_COLOR, visible)):
+        for polyline in polylines:
+            pixels = numpy.empty_like(polyline)
+            pixels[:, 0] = (polyline[:, 0] - min_x) * unit_scale + VIEW_MARGIN
+            pixels[:, 1] = (max_y - polyline[:, 1]) * unit_scale + VIEW_MARGIN
+
+            # hidden lines are dashed, like the SVG exporter draws them
+            segments = _dashes(pixels, HIDDEN_DASH) if color == HIDDEN_COLOR else [pixels]
+            for segment in segments:
+                draw.line(segment.ravel().tolist(), fill=color, width=STROKE_WIDTH)
+
+    return image
+
+_VIEWS: Dict[str, Tuple[float, float, float]] = {
+    'top': (0.0, 0.0, 1.0),
+    'front': (0.0, 1.0, 0.0),
+    'left': (1.0, 0.0, 0.0),
+    'iso': (1.0, 1.0, 1.0),
+}
+
+# rendered views keyed by a digest of the shape's BREP and the projection,
+# so re-rendering an unchanged shape doesn't redo any of the work
+_VIEW_CACHE_SIZE = 32
+_VIEW_CACHE: 'OrderedDict[Tuple[bytes, Tuple[float, float, float]], Image.Image]' = OrderedDict()
+
+def _cache_view(key: Tuple[bytes, Tuple[float, float, float]], image: Image.Image) -> None:
+    _VIEW_CACHE[key] = image
+    while len(_VIEW_CACHE) > _VIEW_CACHE_SIZE:
+        _VIEW_CACHE.popitem(last=False)
+
+def clear_render_cache() -> None:
+    _VIEW_CACHE.clear()
+
+def _render_view(brep: bytes, projection_dir: Tuple[float, float, float]) -> Image.Image:
+    # runs on the caller's executor, so the shape arrives as BREP bytes rather than a workplane
+    shape = cq.Shape.importBrep(io.BytesIO(brep))
+    return render_view_png(cq.Workplane('XY').add(shape), projection_dir)
+
+def _render_views(
+    obj: cq.Workplane,
+    names: List[str],
+    executor: Optional[Executor] = None,
+    copy: bool = True
+) -> Dict[str, Image.Image]:
+    shape = obj.val()
+    if not isinstance(shape, cq.Shape):
+        raise TypeError(f"Expected a cadquery Shape but got: {type(shape).__name__}")
+
+    brep_buffer = io.BytesIO()
+    shape.exportBrep(brep_buffer)
+    brep = brep_buffer.getvalue()
+
+    digest = hashlib.blake2b(brep).digest()
+    images: Dict[str, Image.Image] = {}
+    missing: Dict[str, Tuple[float, float, float]] = {}
+    for name in names:
+        projection_dir = _VIEWS[name]
+        cached = _VIEW_CACHE.get((digest, projection_dir))
+        if cached is None:
+            missing[name] = projection_dir
+        else:
+            _VIEW_CACHE.move_to_end((digest, projection_dir))
+            images[name] = cached
+
+    if executor is None or len(missing) < 2:
+        for name, projection_dir in missing.items():
+            images[name] = render_view_png(obj, projection_dir)
+            _cache_view((digest, projection_dir), images[name])
+    else:
+        # Each view is independent and CPU bound, so they can run in parallel. This
+        # should be a process pool since OCCT can't be trusted across threads.
+        futures = {
+            executor.submit(_render_view, brep, projection_dir): name
+            for name, projection_dir in missing.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            images[name] = future.result()
+            _cache_view((digest, missing[name]), images[name])
+
+    # callers get their own copies so drawing on a result can't change the cache,
+    # unless they only read the images
+    if not copy:
+        return images
+    return {name: image.copy() for name, image in images.items()}
+
+def render_view(obj: cq.Workplane, name: str) -> Image.Image:
+    if name not in _VIEWS:
+        raise ValueError(f"Unknown view: '{name}'")
+
+    return _render_views(obj, [name])[name]
+
+def create_composite_image(obj: cq.Workplane, executor: Optional[Executor] = None) -> Image.Image:
+    # the views render in-process unless the caller hands over a pool to spread them across
+    # the views are only read from, so the cached images are used as they are
+    images = _render_views(obj, list(_VIEWS), executor, copy=False)
+
+    img_top = numpy.asarray(images['top'])
+    img_front = numpy.asarray(images['front'])
+    img_left = numpy.asarray(images['left'])
+    img_iso = numpy.asarray(images['iso'])
+
+    # Every view is rendered at the same size, so the composite is four block
+    # copies into one preallocated canvas
+    height, width, _ = img_top.shape
+    composite = numpy.empty((height * 2, width * 2, 3), dtype=numpy.uint8)
+    composite[:height, :width] = img_top
+    composite[:height, width:] = img_front
+    composite[height:, :width] = img_left
+    composite[height:, width:] = img_iso
+
+    return Image.fromarray(composite)
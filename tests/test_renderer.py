@@ -0,0 +1,77 @@
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import cadquery
+
+import efficio
+import efficio.renderer
+
+class TestRenderer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        efficio.renderer.clear_render_cache()
+
+    def box(self) -> cadquery.Workplane:
+        shape = efficio.new_shape()
+        shape.box(10.0, 20.0, 30.0)
+        return shape.workplane()
+
+    def test_cached_view_is_a_copy(self) -> None:
+        workplane = self.box()
+
+        first = efficio.renderer.render_view(workplane, 'iso')
+        first.paste((255, 0, 0), (0, 0, first.width, first.height))
+
+        # the second render is a cache hit, and doesn't see the paint
+        second = efficio.renderer.render_view(workplane, 'iso')
+        self.assertEqual(len(efficio.renderer._VIEW_CACHE), 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.getpixel((0, 0)), (255, 255, 255))
+
+    def test_clear_render_cache(self) -> None:
+        efficio.renderer.render_view(self.box(), 'top')
+        self.assertEqual(len(efficio.renderer._VIEW_CACHE), 1)
+
+        efficio.renderer.clear_render_cache()
+        self.assertEqual(len(efficio.renderer._VIEW_CACHE), 0)
+
+    def test_render_view_png(self) -> None:
+        image = efficio.renderer.render_view_png(self.box(), (1.0, 1.0, 1.0))
+        self.assertEqual(image.size, (efficio.renderer.VIEW_SIZE, efficio.renderer.VIEW_SIZE))
+        self.assertEqual(image.mode, 'RGB')
+
+        # the iso view of a box has both visible and hidden edges
+        colors = image.getcolors(maxcolors=image.width * image.height)
+        assert colors is not None
+        drawn = {color for _, color in colors}
+        self.assertIn(efficio.renderer.STROKE_COLOR, drawn)
+        self.assertIn(efficio.renderer.HIDDEN_COLOR, drawn)
+
+    def test_render_view_unknown_name(self) -> None:
+        with self.assertRaises(ValueError):
+            efficio.renderer.render_view(self.box(), 'bottom')
+
+    def test_composite_image(self) -> None:
+        workplane = self.box()
+        composite = efficio.renderer.create_composite_image(workplane)
+
+        size = efficio.renderer.VIEW_SIZE
+        self.assertEqual(composite.size, (size * 2, size * 2))
+
+        # top and front on the first row, left and iso on the second
+        quadrants = {'top': (0, 0), 'front': (size, 0), 'left': (0, size), 'iso': (size, size)}
+        for name, (left, top) in quadrants.items():
+            view = efficio.renderer.render_view(workplane, name)
+            quadrant = composite.crop((left, top, left + size, top + size))
+            self.assertEqual(quadrant.tobytes(), view.tobytes(), name)
+
+    def test_composite_image_with_executor(self) -> None:
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            composite = efficio.renderer.create_composite_image(self.box(), executor)
+
+        size = efficio.renderer.VIEW_SIZE
+        self.assertEqual(composite.size, (size * 2, size * 2))
+
+        # the views rendered in the workers are cached back in this process
+        self.assertEqual(len(efficio.renderer._VIEW_CACHE), 4)
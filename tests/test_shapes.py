@@ -1,9 +1,34 @@
+from typing import Sequence
 import unittest
 
+import numpy
+
 import efficio
+from efficio.objects.m3 import (
+    M3_HEAD_HEIGHT_MILLIMETERS,
+    M3_HEAD_RADIUS_MILLIMETERS,
+    M3_NUT_WAC_MILLIMETERS,
+    M3_NUT_WAF_MILLIMETERS,
+    M3BoltShaft
+)
+from efficio.objects.primitives import Cylinder
+from efficio.objects.shapes import WorkplaneShape
+from OCP.StdFail import StdFail_NotDone  # type: ignore
+
+# assertAlmostEqual's default of 7 decimal places
+BOUNDS_TOLERANCE = 5e-8
 
 class TestObjects(unittest.TestCase):
 
+    def assertBoundsAlmostEqual(
+        self,
+        actual: Sequence[float],
+        expected: Sequence[float],
+        tolerance: float = BOUNDS_TOLERANCE
+    ) -> None:
+        # bounds are min x, y, z followed by max x, y, z
+        numpy.testing.assert_allclose(actual, expected, rtol=0, atol=tolerance)
+
     def test_empty_shape(self) -> None:
         empty = efficio.new_shape()
         self.assertIsNone(empty.bounds())
@@ -16,17 +41,14 @@ class TestObjects(unittest.TestCase):
         self.assertIsNotNone(circle_bounds)
         assert circle_bounds is not None
 
-        # min/max x
-        self.assertAlmostEqual(circle_bounds[0], efficio.Millimeter(-10.0).value())
-        self.assertAlmostEqual(circle_bounds[3], efficio.Millimeter(10.0).value())
-
-        # min/max y
-        self.assertAlmostEqual(circle_bounds[1], efficio.Millimeter(-10.0).value())
-        self.assertAlmostEqual(circle_bounds[4], efficio.Millimeter(10.0).value())
-
-        # min/max z
-        self.assertAlmostEqual(circle_bounds[2], efficio.Millimeter(0.0).value())
-        self.assertAlmostEqual(circle_bounds[5], efficio.Millimeter(0.0).value())
+        self.assertBoundsAlmostEqual(circle_bounds, [
+            efficio.Millimeter(-10.0).value(),
+            efficio.Millimeter(-10.0).value(),
+            efficio.Millimeter(0.0).value(),
+            efficio.Millimeter(10.0).value(),
+            efficio.Millimeter(10.0).value(),
+            efficio.Millimeter(0.0).value(),
+        ])
        
     def test_cylinder(self) -> None:
         obj = efficio.new_shape()
@@ -37,27 +59,19 @@ class TestObjects(unittest.TestCase):
         self.assertIsNotNone(circle_bounds)
         assert circle_bounds is not None
 
-        # min/max x
-        self.assertAlmostEqual(circle_bounds[0], efficio.Millimeter(-10.0).value())
-        self.assertAlmostEqual(circle_bounds[3], efficio.Millimeter(10.0).value())
-
-        # min/max y
-        self.assertAlmostEqual(circle_bounds[1], efficio.Millimeter(-10.0).value())
-        self.assertAlmostEqual(circle_bounds[4], efficio.Millimeter(10.0).value())
-
-        # min/max z
-        self.assertAlmostEqual(circle_bounds[2], efficio.Millimeter(0.0).value())
-        self.assertAlmostEqual(circle_bounds[5], efficio.Millimeter(10.0).value())
+        self.assertBoundsAlmostEqual(circle_bounds, [
+            efficio.Millimeter(-10.0).value(),
+            efficio.Millimeter(-10.0).value(),
+            efficio.Millimeter(0.0).value(),
+            efficio.Millimeter(10.0).value(),
+            efficio.Millimeter(10.0).value(),
+            efficio.Millimeter(10.0).value(),
+        ])
 
     def test_m3_bolt_no_clearance(self) -> None:
         bolt = efficio.M3Bolt(efficio.Millimeter(13.0), False)
         self.assertIsNotNone(bolt)
 
-        from efficio.objects.m3 import (
-            M3_HEAD_RADIUS_MILLIMETERS,
-            M3_HEAD_HEIGHT_MILLIMETERS
-        )
-        
         bolt_shape = bolt.shape()
         assert bolt_shape is not None
         self.assertIsNotNone(bolt_shape)
@@ -67,30 +81,19 @@ class TestObjects(unittest.TestCase):
 
         self.assertIsNotNone(bolt_bounds)
 
-        # min/max x
-        self.assertAlmostEqual(bolt_bounds[0], -M3_HEAD_RADIUS_MILLIMETERS.value())
-        self.assertAlmostEqual(bolt_bounds[3], M3_HEAD_RADIUS_MILLIMETERS.value())
-
-        # min/max y
-        self.assertAlmostEqual(bolt_bounds[1], -M3_HEAD_RADIUS_MILLIMETERS.value())
-        self.assertAlmostEqual(bolt_bounds[4], M3_HEAD_RADIUS_MILLIMETERS.value())
-
-        # min/max z
-        self.assertAlmostEqual(bolt_bounds[2], efficio.Millimeter(0.0).value())
-        self.assertAlmostEqual(bolt_bounds[5], M3_HEAD_HEIGHT_MILLIMETERS.value() + 13)
+        self.assertBoundsAlmostEqual(bolt_bounds, [
+            -M3_HEAD_RADIUS_MILLIMETERS.value(),
+            -M3_HEAD_RADIUS_MILLIMETERS.value(),
+            efficio.Millimeter(0.0).value(),
+            M3_HEAD_RADIUS_MILLIMETERS.value(),
+            M3_HEAD_RADIUS_MILLIMETERS.value(),
+            M3_HEAD_HEIGHT_MILLIMETERS.value() + 13,
+        ])
         
     def test_m3_bolt_assembly_no_clearance(self) -> None:
         bolt = efficio.M3BoltAssembly(efficio.Millimeter(13.0), False)
         self.assertIsNotNone(bolt)
 
-        from efficio.objects.m3 import (
-            M3_HEAD_HEIGHT_MILLIMETERS,
-            M3_NUT_WAF_MILLIMETERS,
-            M3_NUT_WAC_MILLIMETERS,
-            M3_NUT_HEIGHT_MILLIMETERS,
-            M3_NUT_WAC_MILLIMETERS
-        )
-        
         bolt_shape = bolt.shape()
         assert bolt_shape is not None
         self.assertIsNotNone(bolt_shape)
@@ -100,15 +103,202 @@ class TestObjects(unittest.TestCase):
 
         self.assertIsNotNone(bolt_bounds)
 
-        # min/max x
-        self.assertAlmostEqual(bolt_bounds[0], -M3_NUT_WAC_MILLIMETERS.value()/2)
-        self.assertAlmostEqual(bolt_bounds[3], M3_NUT_WAC_MILLIMETERS.value()/2)
+        self.assertBoundsAlmostEqual(bolt_bounds, [
+            -M3_NUT_WAC_MILLIMETERS.value()/2,
+            -M3_NUT_WAF_MILLIMETERS.value()/2,
+            efficio.Millimeter(0.0).value(),
+            M3_NUT_WAC_MILLIMETERS.value()/2,
+            M3_NUT_WAF_MILLIMETERS.value()/2,
+            M3_HEAD_HEIGHT_MILLIMETERS.value() + 13,
+        ])
+        
 
-        # min/max y
-        self.assertAlmostEqual(bolt_bounds[1], -M3_NUT_WAF_MILLIMETERS.value()/2)
-        self.assertAlmostEqual(bolt_bounds[4], M3_NUT_WAF_MILLIMETERS.value()/2)
+    def test_object_shape_is_cached_copy(self) -> None:
+        bolt = efficio.M3Bolt(efficio.Millimeter(13.0), False)
 
-        # min/max z
-        self.assertAlmostEqual(bolt_bounds[2], efficio.Millimeter(0.0).value())
-        self.assertAlmostEqual(bolt_bounds[5], M3_HEAD_HEIGHT_MILLIMETERS.value() + 13)
-        
+        first_shape = bolt.shape()
+        assert first_shape is not None
+        first_bounds = first_shape.bounds()
+        assert first_bounds is not None
+
+        # mutating a returned shape must not leak into the cached geometry
+        first_shape.translate(10, 0, 0)
+
+        second_shape = bolt.shape()
+        assert second_shape is not None
+        self.assertIsNot(first_shape, second_shape)
+        self.assertEqual(second_shape.bounds(), first_bounds)
+
+    def test_clone_has_its_own_workplane(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+        cloned = obj.clone()
+
+        # Workplane.add() extends the object list in place
+        other = efficio.new_shape()
+        other.box(1.0, 1.0, 1.0)
+        cloned.workplane().add(other.workplane().vals())
+
+        self.assertEqual(len(cloned.workplane().vals()), 2)
+        self.assertEqual(len(obj.workplane().vals()), 1)
+
+    def test_object_parameters_are_read_only(self) -> None:
+        cylinder = Cylinder(efficio.Millimeter(10.0), efficio.Millimeter(2.0))
+        with self.assertRaises(AttributeError):
+            setattr(cylinder, 'length', efficio.Millimeter(20.0))
+
+        # sub-objects can't be swapped out from under the cached shape either
+        bolt = efficio.M3Bolt(efficio.Millimeter(13.0), False)
+        with self.assertRaises(AttributeError):
+            setattr(bolt, 'shaft', M3BoltShaft(efficio.Millimeter(20.0), False))
+
+    def test_bounds_follow_mutation(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+
+        box_bounds = obj.bounds()
+        assert box_bounds is not None
+        self.assertAlmostEqual(box_bounds[0], -5.0)
+
+        obj.translate(5.0, 0, 0)
+        moved_bounds = obj.bounds()
+        assert moved_bounds is not None
+        self.assertAlmostEqual(moved_bounds[0], 0.0)
+        self.assertAlmostEqual(moved_bounds[3], 10.0)
+
+    def test_composed_rotation_matches_sequential(self) -> None:
+        composed = efficio.new_shape()
+        composed.box(10.0, 20.0, 30.0)
+        composed.translate(5.0, 10.0, 15.0)
+        composed.rotate(90, 0, 90)
+
+        sequential = efficio.new_shape()
+        sequential.box(10.0, 20.0, 30.0)
+        sequential.translate(5.0, 10.0, 15.0)
+        sequential.rotate(90, 0, 0)
+        sequential.rotate(0, 0, 90)
+
+        composed_bounds = composed.bounds()
+        sequential_bounds = sequential.bounds()
+        assert composed_bounds is not None
+        assert sequential_bounds is not None
+
+        self.assertBoundsAlmostEqual(composed_bounds, sequential_bounds)
+
+    def test_rotation(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 20.0, 30.0)
+        obj.rotate(0, 0, 90)
+
+        # a quarter turn about z swaps the x and y extents
+        obj_bounds = obj.bounds()
+        assert obj_bounds is not None
+        self.assertBoundsAlmostEqual(obj_bounds, [-10.0, -5.0, -15.0, 10.0, 5.0, 15.0])
+
+    def test_fused_moves_match_stepwise(self) -> None:
+        moves = [('translate', (5.0, 0, 0)), ('rotate', (0, 0, 90)), ('translate', (0, 0, 7.0)), ('rotate', (90, 0, 0))]
+
+        fused = efficio.new_shape()
+        fused.box(10.0, 20.0, 30.0)
+        for name, args in moves:
+            getattr(fused, name)(*args)
+
+        # reading the bounds applies each move on its own
+        stepwise = efficio.new_shape()
+        stepwise.box(10.0, 20.0, 30.0)
+        for name, args in moves:
+            getattr(stepwise, name)(*args)
+            stepwise.bounds()
+
+        fused_bounds = fused.bounds()
+        stepwise_bounds = stepwise.bounds()
+        assert fused_bounds is not None
+        assert stepwise_bounds is not None
+
+        self.assertBoundsAlmostEqual(fused_bounds, stepwise_bounds)
+
+    def test_chained_boolean_operations(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+        for offset in (10.0, 20.0):
+            other = efficio.new_shape()
+            other.box(10.0, 10.0, 10.0)
+            other.translate(offset, 0, 0)
+            obj.union(other)
+
+        hole = efficio.new_shape()
+        hole.box(10.0, 10.0, 10.0)
+        hole.translate(20.0, 0, 0)
+        obj.cut(hole)
+
+        obj_bounds = obj.bounds()
+        assert obj_bounds is not None
+        self.assertAlmostEqual(obj_bounds[0], -5.0)
+        self.assertAlmostEqual(obj_bounds[3], 15.0)
+
+    def test_recorded_operations_apply_in_order(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+        obj.translate(5.0, 0, 0)
+
+        other = efficio.new_shape()
+        other.box(10.0, 10.0, 10.0)
+        obj.union(other)
+        obj.translate(0, 0, 5.0)
+
+        # changing the operand afterwards doesn't reach back into the union
+        other.translate(100.0, 0, 0)
+
+        obj_bounds = obj.bounds()
+        assert obj_bounds is not None
+        self.assertAlmostEqual(obj_bounds[0], -5.0)
+        self.assertAlmostEqual(obj_bounds[2], 0.0)
+        self.assertAlmostEqual(obj_bounds[3], 10.0)
+        self.assertAlmostEqual(obj_bounds[5], 10.0)
+
+    def test_failed_operation_is_not_dropped(self) -> None:
+        obj = efficio.new_shape()
+        assert isinstance(obj, WorkplaneShape)
+        obj.box(10.0, 10.0, 10.0)
+        obj.translate(5.0, 0, 0)
+
+        # the fillet is larger than the box, so replaying the ops fails
+        obj.fillet_edges(20.0)
+        with self.assertRaises(StdFail_NotDone):
+            obj.bounds()
+
+        # the recorded ops are kept, so the failure keeps surfacing rather
+        # than falling back to older geometry
+        self.assertEqual([name for name, _ in obj._ops], ['box', 'move', 'fillet_edges'])
+        with self.assertRaises(StdFail_NotDone):
+            obj.bounds()
+
+    def test_cut_from_top_and_bottom(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+
+        top = obj.cut_from_top(3.0, clone=True)
+        top_bounds = top.bounds()
+        assert top_bounds is not None
+        self.assertAlmostEqual(top_bounds[2], 2.0)
+        self.assertAlmostEqual(top_bounds[5], 5.0)
+
+        obj.cut_from_bottom(4.0)
+        bottom_bounds = obj.bounds()
+        assert bottom_bounds is not None
+        self.assertAlmostEqual(bottom_bounds[2], -5.0)
+        self.assertAlmostEqual(bottom_bounds[5], -1.0)
+
+    def test_stl_bytes(self) -> None:
+        obj = efficio.new_shape()
+        obj.box(10.0, 10.0, 10.0)
+
+        # a box tessellates to two triangles per face
+        data = obj.as_stl_bytes()
+        facet_count = int.from_bytes(data[80:84], 'little')
+        self.assertEqual(facet_count, 12)
+        self.assertEqual(len(data), 84 + 50 * facet_count)
+
+        text = obj.as_stl_bytes(binary=False).decode('ascii')
+        self.assertTrue(text.startswith('solid'))
+        self.assertEqual(text.count('endfacet'), 12)